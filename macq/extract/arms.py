@@ -2,29 +2,70 @@
 
 from collections import Counter, defaultdict
 from dataclasses import dataclass
-from typing import Dict, Hashable, List, Set, Tuple
+from itertools import chain
+import sys
+from typing import Any, Dict, Hashable, List, Optional, Set, Tuple
 from warnings import warn
 
-from nnf import And, Or, Var
+from nnf import Or, Var
 from nnf import false as nnffalse
 
 from ..observation import Observation, ObservedTraceList, PartialObservation
 from ..trace import Action, Fluent
-from ..utils.pysat import RC2, WCNF, to_wcnf
+from ..utils.pysat import RC2Stratified, WCNF, to_wcnf
 from . import LearnedAction, LearnedFluent, Model
 from .exceptions import IncompatibleObservationToken, InvalidMaxSATModel
 
 
+class _Literals:
+    """Interns the NNF literals built while generating the step 2 constraints.
+
+    A new instance is used for each round of constraint generation, so the
+    shared objects are released along with the constraints.
+    """
+
+    def __init__(self):
+        self._lits: Dict[str, Var] = {}
+        self._neg_lits: Dict[str, Var] = {}
+        self._neg_units: Dict[str, Or[Var]] = {}
+
+    def lit(self, name: str) -> Var:
+        """Returns the shared NNF variable with the given name."""
+        if name not in self._lits:
+            self._lits[name] = Var(sys.intern(name))
+        return self._lits[name]
+
+    def neg_lit(self, name: str) -> Var:
+        """Returns the shared negated NNF variable with the given name."""
+        if name not in self._neg_lits:
+            self._neg_lits[name] = self.lit(name).negate()
+        return self._neg_lits[name]
+
+    def neg_unit(self, name: str) -> Or[Var]:
+        """Returns the shared unit clause negating the NNF variable with the given name."""
+        if name not in self._neg_units:
+            self._neg_units[name] = Or([self.neg_lit(name)])
+        return self._neg_units[name]
+
+
 @dataclass
 class Relation:
     """Fluents with the parameters replaced by their types."""
 
+    # one relation is created per fluent, so avoid a per-instance __dict__
+    __slots__ = ("name", "types", "_var")
+
     name: str
     types: list
 
+    def __post_init__(self):
+        # relations are used as dictionary keys throughout ARMS, so build the
+        # variable representation once
+        self._var = f"{self.name} {' '.join(list(self.types))}"
+
     def var(self):
         """Generates the variable representation for NNF."""
-        return f"{self.name} {' '.join(list(self.types))}"
+        return self._var
 
     def matches(self, action: LearnedAction):
         """Determines if a relation is related to a given action."""
@@ -36,7 +77,53 @@ class Relation:
         )
 
     def __hash__(self):
-        return hash(self.var())
+        return hash(self._var)
+
+
+def _relevant_pairs(
+    actions: List[LearnedAction], relations: List[Relation]
+) -> List[Tuple[str, str]]:
+    """Finds the relations relevant to each action.
+
+    Returns:
+        The (action details, relation var) pair of each relevant action and relation.
+    """
+    # Encode sets of types as bitmasks, so checking that all of a relation's
+    # types are parameter types of an action is a single integer operation.
+    type_bits: Dict[str, int] = {}
+
+    def mask(types: List[str]) -> int:
+        m = 0
+        for t in types:
+            m |= type_bits.setdefault(t, 1 << len(type_bits))
+        return m
+
+    # relation.matches only needs to be called to compare the counts of
+    # repeated types
+    rel_info = [
+        (r, r.var(), mask(r.types), len(set(r.types)) < len(r.types)) for r in relations
+    ]
+    pairs = []
+    for action in actions:
+        details = action.details()
+        action_mask = mask(action.obj_params)
+        # A relation is relevant to an action if they share parameter types
+        pairs.extend(
+            (details, var)
+            for r, var, rel_mask, repeated in rel_info
+            if not rel_mask & ~action_mask and (not repeated or r.matches(action))
+        )
+    return pairs
+
+
+def _literal_prefixes(var: str) -> Tuple[str, str, str]:
+    """Builds a relation's add, pre, and del literal names, minus the action details."""
+    # (BREAK) marks unambiguous breakpoints for parsing later
+    return (
+        f"{var} (BREAK) in (BREAK) add (BREAK) ",
+        f"{var} (BREAK) in (BREAK) pre (BREAK) ",
+        f"{var} (BREAK) in (BREAK) del (BREAK) ",
+    )
 
 
 @dataclass
@@ -74,6 +161,13 @@ class ARMS:
         threshold: float = 0.6,
         info3_default: int = 30,
         plan_default: int = 30,
+        solver: str = "g3",
+        adapt: bool = True,
+        exhaust: bool = True,
+        blo: str = "div",
+        incr: bool = False,
+        minz: bool = True,
+        trim: int = 0,
     ):
         """
         Arguments:
@@ -97,6 +191,21 @@ class ARMS:
                 The default weight for I3 constraints with probability below the threshold.
             plan_default (int):
                 The default weight for plan constraints with probability below the threshold.
+            solver (str):
+                The SAT solver used by the RC2 MAX-SAT solver. Defaults to "g3" (Glucose 3).
+            adapt (bool):
+                Whether RC2 should detect and adapt intrinsic AtMost1 constraints.
+            exhaust (bool):
+                Whether RC2 should exhaust unsatisfiable cores.
+            blo (str):
+                The Boolean lexicographic optimization (stratification) strategy used
+                by RC2. "cluster" is worth trying on theories where "div" is slow.
+            incr (bool):
+                Whether RC2 should use incremental mode in the SAT solver.
+            minz (bool):
+                Whether RC2 should minimize unsatisfiable cores.
+            trim (int):
+                The number of times RC2 should try to trim unsatisfiable cores.
         """
         if obs_tracelist.type is not PartialObservation:
             raise IncompatibleObservationToken(obs_tracelist.type, ARMS)
@@ -117,6 +226,15 @@ class ARMS:
             threshold,
             info3_default,
             plan_default,
+            dict(
+                solver=solver,
+                adapt=adapt,
+                exhaust=exhaust,
+                blo=blo,
+                incr=incr,
+                minz=minz,
+                trim=trim,
+            ),
             debug,
         )
 
@@ -143,6 +261,7 @@ class ARMS:
         threshold: float,
         info3_default: int,
         plan_default: int,
+        rc2_options: Dict[str, Any],
         debug: bool,
     ) -> Set[LearnedAction]:
         """The main driver for the ARMS algorithm."""
@@ -194,7 +313,7 @@ class ARMS:
             if debug3:
                 input("Press enter to continue...")
 
-            model = ARMS.step4(max_sat, decode)
+            model = ARMS.step4(max_sat, decode, rc2_options)
 
             debug5 = ARMS.debug_menu("Debug step 5?") if debug else False
             # Mutates the LearnedAction (keys) of action_map_rev
@@ -295,17 +414,32 @@ class ARMS:
             learned_actions.add(learned_action)
             action_map[obs_action] = learned_action
 
-        connected_actions: Dict[LearnedAction, Dict[LearnedAction, Set[str]]] = {}
-        for a1 in learned_actions:
-            connected_actions[a1] = {}
-            for a2 in learned_actions.difference({a1}):  # includes connecting with self
-                intersection = set(a1.obj_params).intersection(set(a2.obj_params))
-                if intersection:
-                    connected_actions[a1][a2] = intersection
-                    if debug:
-                        print(
-                            f"{a1.details()} is connected to {a2.details()} by {intersection}"
-                        )
+        actions = list(learned_actions)
+        action_types = [set(a.obj_params) for a in actions]
+
+        # index actions by the object types they use, so only actions sharing
+        # at least one type are compared
+        type_index: Dict[str, List[int]] = defaultdict(list)
+        for i, types in enumerate(action_types):
+            for t in types:
+                type_index[t].append(i)
+
+        connected_actions: Dict[LearnedAction, Dict[LearnedAction, Set[str]]] = {
+            a: {} for a in actions
+        }
+        for i, a1 in enumerate(actions):
+            candidates = set(
+                chain.from_iterable(type_index[t] for t in action_types[i])
+            )
+            for j in sorted(c for c in candidates if c > i):
+                a2 = actions[j]
+                intersection = action_types[i].intersection(action_types[j])
+                connected_actions[a1][a2] = intersection
+                connected_actions[a2][a1] = intersection
+                if debug:
+                    print(
+                        f"{a1.details()} is connected to {a2.details()} by {intersection}"
+                    )
 
         return connected_actions, action_map
 
@@ -344,13 +478,15 @@ class ARMS:
 
         debuga = ARMS.debug_menu("Debug action constraints?") if debug else False
 
+        # share the interned literals between the action and info constraints
+        literals = _Literals()
         action_constraints = ARMS.step2A(
-            connected_actions, set(relations.values()), debuga
+            connected_actions, set(relations.values()), debuga, literals
         )
 
         debugi = ARMS.debug_menu("Debug info constraints?") if debug else False
         info_constraints, info_support_counts = ARMS.step2I(
-            obs_tracelist, relations, action_map, debugi
+            obs_tracelist, relations, action_map, debugi, literals
         )
 
         debugp = ARMS.debug_menu("Debug plan constraints?") if debug else False
@@ -378,6 +514,7 @@ class ARMS:
         connected_actions: Dict[LearnedAction, Dict[LearnedAction, Set]],
         relations: Set[Relation],
         debug: bool,
+        literals: Optional[_Literals] = None,
     ) -> List[Or[Var]]:
         """Action constraints.
 
@@ -390,64 +527,48 @@ class ARMS:
 
         if debug:
             print("\nBuilding action constraints...\n")
+        if literals is None:
+            literals = _Literals()
 
         def implication(a: Var, b: Var):
             return Or([a.negate(), b])
 
         constraints: List[Or[Var]] = []
-        actions = set(connected_actions.keys())
-        for action in actions:
-            for relation in relations:
-                # A relation is relevant to an action if they share parameter types
-                if relation.matches(action):
-                    if debug:
-                        print(
-                            f'relation ({relation.var()}) is relevant to action "{action.details()}"\n'
-                            "A1:\n"
-                            f"  {relation.var()}∈ add ⇒ {relation.var()}∉ pre\n"
-                            f"  {relation.var()}∈ pre ⇒ {relation.var()}∉ add\n"
-                            "A2:\n"
-                            f"  {relation.var()}∈ del ⇒ {relation.var()}∈ pre\n"
-                        )
+        actions = list(connected_actions.keys())
+        relations_list = list(relations)
+        pairs = _relevant_pairs(actions, relations_list)
 
-                    # A1
-                    # relation in action.add => relation not in action.precond
-                    # relation in action.precond => relation not in action.add
-
-                    # (BREAK) marks unambiguous breakpoints for parsing later
-                    constraints.append(
-                        implication(
-                            Var(
-                                f"{relation.var()} (BREAK) in (BREAK) add (BREAK) {action.details()}"
-                            ),
-                            Var(
-                                f"{relation.var()} (BREAK) in (BREAK) pre (BREAK) {action.details()}"
-                            ).negate(),
-                        )
-                    )
-                    constraints.append(
-                        implication(
-                            Var(
-                                f"{relation.var()} (BREAK) in (BREAK) pre (BREAK) {action.details()}"
-                            ),
-                            Var(
-                                f"{relation.var()} (BREAK) in (BREAK) add (BREAK) {action.details()}"
-                            ).negate(),
-                        )
-                    )
+        # the literal names of a relation only differ by the action details
+        prefixes = {r.var(): _literal_prefixes(r.var()) for r in relations_list}
+        for details, var in pairs:
+            if debug:
+                print(
+                    f'relation ({var}) is relevant to action "{details}"\n'
+                    "A1:\n"
+                    f"  {var}∈ add ⇒ {var}∉ pre\n"
+                    f"  {var}∈ pre ⇒ {var}∉ add\n"
+                    "A2:\n"
+                    f"  {var}∈ del ⇒ {var}∈ pre\n"
+                )
 
-                    # A2
-                    # relation in action.del => relation in action.precond
-                    constraints.append(
-                        implication(
-                            Var(
-                                f"{relation.var()} (BREAK) in (BREAK) del (BREAK) {action.details()}"
-                            ),
-                            Var(
-                                f"{relation.var()} (BREAK) in (BREAK) pre (BREAK) {action.details()}"
-                            ),
-                        )
-                    )
+            add_prefix, pre_prefix, del_prefix = prefixes[var]
+            in_add = add_prefix + details
+            in_pre = pre_prefix + details
+            in_del = del_prefix + details
+
+            # A1
+            # relation in action.add => relation not in action.precond
+            # relation in action.precond => relation not in action.add
+            constraints.append(
+                implication(literals.lit(in_add), literals.neg_lit(in_pre))
+            )
+            constraints.append(
+                implication(literals.lit(in_pre), literals.neg_lit(in_add))
+            )
+
+            # A2
+            # relation in action.del => relation in action.precond
+            constraints.append(implication(literals.lit(in_del), literals.lit(in_pre)))
 
         return constraints
 
@@ -457,6 +578,7 @@ class ARMS:
         relations: Dict[Fluent, Relation],
         actions: Dict[Action, LearnedAction],
         debug: bool,
+        literals: Optional[_Literals] = None,
     ) -> Tuple[List[Or[Var]], Dict[Or[Var], int]]:
         """Information constraints.
 
@@ -480,90 +602,102 @@ class ARMS:
         """
         if debug:
             print("\nBuilding information constraints...")
+        if literals is None:
+            literals = _Literals()
         constraints: List[Or[Var]] = []
-        support_counts: Dict[Or[Var], int] = defaultdict(int)
+        # count the I3 literals by name, only building their clauses at the end
+        support_counts: Dict[str, int] = Counter()
+        # each fluent's relation along with its variable representation and
+        # literal name prefixes, so that a single lookup is needed per true fluent
+        rel_prefixes = {r: _literal_prefixes(r.var()) for r in set(relations.values())}
+        fluent_info: Dict[Fluent, Tuple[Relation, str, Tuple[str, str, str]]] = {
+            f: (r, r.var(), rel_prefixes[r]) for f, r in relations.items()
+        }
+        # relation.matches results, keyed by the relation and the action details
+        relevant: Dict[Tuple[Relation, str], bool] = {}
+
+        def matches(relation: Relation, action: LearnedAction, details: str) -> bool:
+            key = (relation, details)
+            if key not in relevant:
+                relevant[key] = relation.matches(action)
+            return relevant[key]
+
         obs_trace: List[Observation]
         for obs_trace_i, obs_trace in enumerate(obs_tracelist):
+            # the learned action taken at each step of the trace, and its details
+            learned: List[Optional[LearnedAction]] = [
+                actions.get(obs.action) for obs in obs_trace  # type: ignore
+            ]
+            details = [a.details() if a is not None else "" for a in learned]
+
+            # The I1 literals of a relation only grow as the trace is walked, so
+            # keep a running list per relation rather than rescanning the prefix
+            # of the trace at every step.
+            # The clause is only rebuilt once new literals have been added.
+            add_vars: Dict[Relation, List[Var]] = defaultdict(list)
+            add_clauses: Dict[Relation, Or[Var]] = {}
+            scanned: Dict[Relation, int] = defaultdict(int)
             for i, obs in enumerate(obs_trace):
                 if obs.state is not None and i > 0:
                     n = i - 1
+                    a_i = learned[i]
+                    a_n = learned[n]
                     if debug:
                         print(
                             f"\nStep {i} of observation list {obs_trace_i} contains state information."
                         )
                     for fluent, val in obs.state.items():
-                        relation = relations[fluent]
                         # Information constraints only apply to true relations
                         if val:
+                            relation, var, prefixes = fluent_info[fluent]
+                            add_prefix, pre_prefix, del_prefix = prefixes
                             if debug:
                                 print(
                                     f"  Fluent {fluent} is true.\n"
-                                    f"    ({relation.var()})∈ ("
-                                    f"{' ∪ '.join([f'add_{{ {actions[obs_trace[ik].action].details()} }}' for ik in range(0,n+1) if obs_trace[ik].action in actions] )}"  # type: ignore
+                                    f"    ({var})∈ ("
+                                    f"{' ∪ '.join([f'add_{{ {details[ik]} }}' for ik in range(0,n+1) if learned[ik] is not None])}"
                                     ")"
                                 )
                             # I1
                             # relation in the add list of an action <= n (i-1)
-                            i1: List[Var] = []
-                            for obs_i in obs_trace[: i - 1]:
-                                if obs_i.action in actions and obs_i.action is not None:
-                                    ai = actions[obs_i.action]
-                                    if relation.matches(ai):
-                                        i1.append(
-                                            Var(
-                                                f"{relation.var()} (BREAK) in (BREAK) add (BREAK) {ai.details()}"
-                                            )
-                                        )
+                            i1: List[Var] = add_vars[relation]
+                            for k in range(scanned[relation], n):
+                                ak = learned[k]
+                                if ak is not None and matches(relation, ak, details[k]):
+                                    i1.append(literals.lit(add_prefix + details[k]))
+                                    add_clauses.pop(relation, None)
+                            scanned[relation] = max(scanned[relation], n)
+                            if i1 and relation not in add_clauses:
+                                add_clauses[relation] = Or(i1)
 
                             # I2
                             # relation not in del list of action n (i-1)
                             i2 = None
-                            a_n = obs_trace[i - 1].action
-                            if a_n in actions and a_n is not None:
-                                i2 = Var(
-                                    f"{relation.var()} (BREAK) in (BREAK) del (BREAK) {actions[a_n].details()}"
-                                ).negate()
+                            if a_n is not None:
+                                i2 = literals.neg_unit(del_prefix + details[n])
 
                             if i1:
-                                constraints.append(Or(i1))
-                            if i2:
-                                constraints.append(Or([i2]))
+                                constraints.append(add_clauses[relation])
+                            if i2 is not None:
+                                constraints.append(i2)
 
                             # I3
                             # count occurences
                             if (
                                 i < len(obs_trace) - 1
-                                and obs.action in actions
-                                and obs.action is not None  # for the linter
-                                and relation.matches(actions[obs.action])
+                                and a_i is not None
+                                and matches(relation, a_i, details[i])
                             ):
                                 # corresponding constraint is related to the current action's precondition list
-                                support_counts[
-                                    Or(
-                                        [
-                                            Var(
-                                                f"{relation.var()} (BREAK) in (BREAK) pre (BREAK) {actions[obs.action].details()}"
-                                            )
-                                        ]
-                                    )
-                                ] += 1
-                            elif (
-                                a_n in actions
-                                and a_n is not None
-                                and relation.matches(actions[a_n])
-                            ):
+                                support_counts[pre_prefix + details[i]] += 1
+                            elif a_n is not None and matches(relation, a_n, details[n]):
                                 # corresponding constraint is related to the previous action's add list
-                                support_counts[
-                                    Or(
-                                        [
-                                            Var(
-                                                f"{relation.var()} (BREAK) in (BREAK) add (BREAK) {actions[a_n].details()}"
-                                            )
-                                        ]
-                                    )
-                                ] += 1
-
-        return constraints, support_counts
+                                support_counts[add_prefix + details[n]] += 1
+
+        return constraints, {
+            Or([literals.lit(name)]): support
+            for name, support in support_counts.items()
+        }
 
     @staticmethod
     def _apriori(
@@ -740,10 +874,9 @@ class ARMS:
                     weight, constraints_w_weights[constraint]
                 )
 
-        problem: And[Or[Var]] = And(list(constraints_w_weights.keys()))
-        weights = list(constraints_w_weights.values())
-
-        wcnf, decode = to_wcnf(problem, weights)
+        wcnf, decode = to_wcnf(
+            list(constraints_w_weights.keys()), list(constraints_w_weights.values())
+        )
         return wcnf, decode
 
     @staticmethod
@@ -766,9 +899,16 @@ class ARMS:
         return list(map(get_support_rate, support_counts))
 
     @staticmethod
-    def step4(max_sat: WCNF, decode: Dict[int, Hashable]) -> Dict[Hashable, bool]:
-        """(Step 4) Solve the MAX-SAT problem built in Step 3."""
-        solver = RC2(max_sat)
+    def step4(
+        max_sat: WCNF,
+        decode: Dict[int, Hashable],
+        rc2_options: Optional[Dict[str, Any]] = None,
+    ) -> Dict[Hashable, bool]:
+        """(Step 4) Solve the MAX-SAT problem built in Step 3.
+
+        `rc2_options` are passed on to the stratified RC2 solver.
+        """
+        solver = RC2Stratified(max_sat, **(rc2_options or {}))
 
         encoded_model = solver.compute()
 
@@ -11,7 +11,13 @@ except ModuleNotFoundError:
 
 
 def tqdm_progress(iterable=None, *args, **kwargs) -> Any:
-    """Wraps a loop with tqdm to output a progress bar."""
+    """Wraps a loop with tqdm to output a progress bar.
+
+    Passing `quiet=True` returns the iterable itself, so the loop runs without
+    any progress tracking overhead.
+    """
+    if kwargs.pop("quiet", False):
+        return iterable
     if isinstance(iterable, range):
         return trange(iterable.start, iterable.stop, iterable.step, *args, **kwargs)
     return tqdm(iterable, *args, **kwargs)
@@ -20,40 +26,45 @@ def tqdm_progress(iterable=None, *args, **kwargs) -> Any:
 class vanilla_progress:
     """Wraps a loop to output progress reports."""
 
-    def __init__(self, iterable: Iterable[Any], *args, **kwargs):
+    def __init__(self, iterable: Iterable[Any], *args, quiet: bool = False, **kwargs):
         """Initializes a vanilla_progress object with the given iterable.
 
         Args:
             iterable (Iterable):
                 The iterable to loop over and track the progress of.
+            quiet (bool):
+                Optional; If True, iterates without reporting progress. Defaults
+                to False.
         """
         self.iterable = iterable
+        self.quiet = quiet
         self.args = args
         self.kwargs = kwargs
 
     def __iter__(self) -> Iterator[Any]:
-        if isinstance(self.iterable, range):
-            start = self.iterable.start
-            stop = self.iterable.stop
-            step = self.iterable.step
-            total = (stop - start) / step
-        elif isinstance(self.iterable, Sized):
+        if isinstance(self.iterable, Sized):
             total = len(self.iterable)
         else:
             total = None
 
+        # iterate over the underlying iterator directly when there is nothing
+        # to report, skipping the per-item bookkeeping
+        if self.quiet or total is None:
+            return iter(self.iterable)
+        return self._report(total)
+
+    def _report(self, total: int) -> Iterator[Any]:
         prev = 0
         it = 1
         for i in self.iterable:
             yield i
-            if total is not None:
-                new = int(str(it / total)[2])
-                if new != prev:
-                    prev = new
-                    if new == 0:
-                        print("100%")
-                    else:
-                        print(f"{new}0% ...")
+            new = (10 * it) // total if total else 0
+            if new != prev and 0 <= new <= 10:
+                prev = new
+                if new == 10:
+                    print("100%")
+                else:
+                    print(f"{new}0% ...")
             it += 1
 
 
@@ -1,17 +1,19 @@
-from typing import List, Tuple, Dict, Hashable
+from typing import Dict, Hashable, Iterable, List, Optional, Sequence, Tuple, Union
 from pysat.formula import WCNF
-from pysat.examples.rc2 import RC2
+from pysat.examples.rc2 import RC2, RC2Stratified
 from nnf import And, Or, Var
 from ..extract.exceptions import InvalidMaxSATModel
 
 
 def get_encoding(
-    clauses: And[Or[Var]], start: int = 1
+    clauses: Iterable[Or[Var]], start: int = 1
 ) -> Tuple[Dict[Hashable, int], Dict[int, Hashable]]:
     """Maps NNF clauses to pysat clauses and vice-versa.
 
+    Variables are numbered in the order they first appear in the clauses.
+
     Args:
-        clauses (And[Or[Var]]):
+        clauses (Iterable[Or[Var]]):
             NNF clauses (in conjunctive normal form) to be mapped to pysat clauses.
         start (int):
             Optional; The number to start the mapping from. Defaults to 1.
@@ -20,16 +22,20 @@ def get_encoding(
         Tuple[Dict[Hashable, int], Dict[int, Hashable]]:
             The encode mapping (NNF to pysat), and the decode mapping (pysat to NNF).
     """
-    decode = dict(enumerate(clauses.vars(), start=start))
-    encode = {v: k for k, v in decode.items()}
+    encode: Dict[Hashable, int] = {}
+    for clause in clauses:
+        for var in clause:
+            if var.name not in encode:
+                encode[var.name] = start + len(encode)
+    decode = {v: k for k, v in encode.items()}
     return encode, decode
 
 
-def encode(clauses: And[Or[Var]], encode: Dict[Hashable, int]) -> List[List[int]]:
+def encode(clauses: Iterable[Or[Var]], encode: Dict[Hashable, int]) -> List[List[int]]:
     """Encodes NNF clauses into pysat clauses.
 
     Args:
-        clauses (And[Or[Var]]):
+        clauses (Iterable[Or[Var]]):
             NNF clauses (in conjunctive normal form) to be converted to pysat clauses.
         encode (Dict[Hashable, int]):
             The encode mapping to apply to the NNF clauses.
@@ -46,16 +52,20 @@ def encode(clauses: And[Or[Var]], encode: Dict[Hashable, int]) -> List[List[int]
 
 
 def to_wcnf(
-    soft_clauses: And[Or[Var]], weights: List[int], hard_clauses: And[Or[Var]] = None
+    soft_clauses: Union[And[Or[Var]], Sequence[Or[Var]]],
+    weights: List[int],
+    hard_clauses: Optional[Union[And[Or[Var]], Sequence[Or[Var]]]] = None,
 ) -> Tuple[WCNF, Dict[int, Hashable]]:
     """Builds a pysat weighted CNF theory from pysat clauses.
 
     Args:
-        soft_clauses (And[Or[Var]]):
-            The soft clauses (NNF clauses, in CNF) for the WCNF theory.
+        soft_clauses (Union[And[Or[Var]], Sequence[Or[Var]]]):
+            The soft clauses (NNF clauses, in CNF) for the WCNF theory. Pass a
+            sequence to pair each clause with the weight at the same position;
+            the clauses of an `And` are unordered.
         weights (List[int]):
             The weights to associate with the soft clauses.
-        hard_clauses (And[Or[Var]]):
+        hard_clauses (Union[And[Or[Var]], Sequence[Or[Var]]]):
             Optional; Hard clauses (unweighted) to add to the WCNF theory.
 
     Returns:
@@ -1,7 +1,9 @@
 from pathlib import Path
 from typing import List
+from nnf import Or, Var
 from macq.trace import *
 from macq.extract import Extract, modes
+from macq.extract.arms import ARMS, ARMSConstraints
 from macq.observation import PartialObservation
 from macq.generate.pddl import *
 
@@ -58,4 +60,33 @@ def test_arms():
     )
     model.to_pddl(
         "model_blocks_dom", "model_blocks_prob", model_blocks_dom, model_blocks_prob
-    )
\ No newline at end of file
+    )
+
+
+def test_arms_step3_weights():
+    action = [Or([Var(f"a{i}"), ~Var(f"b{i}")]) for i in range(10)]
+    info = [Or([~Var(f"a{i}"), Var(f"c{i}")]) for i in range(10)]
+    info3 = {Or([Var(f"c{i}")]): i + 1 for i in range(10)}
+    plan = {Or([Var(f"b{i}"), Var(f"c{i}")]): 10 - i for i in range(10)}
+    constraints = ARMSConstraints(action, info, info3, plan)
+
+    expected = {c: 110 for c in action}
+    expected.update({c: 100 for c in info})
+    # with a threshold of 0, the support rates are count / max count * 100
+    expected.update({c: n * 10 for c, n in info3.items()})
+    expected.update({c: n * 10 for c, n in plan.items()})
+
+    wcnf, decode = ARMS.step3(
+        constraints,
+        action_weight=110,
+        info_weight=100,
+        threshold=0,
+        info3_default=30,
+        plan_default=30,
+        debug=False,
+    )
+
+    assert len(wcnf.soft) == len(expected)
+    for clause, weight in zip(wcnf.soft, wcnf.wght):
+        decoded = Or([Var(decode[abs(v)], v > 0) for v in clause])
+        assert expected[decoded] == weight
@@ -0,0 +1,20 @@
+from macq.utils.progress import vanilla_progress
+
+
+def test_vanilla_progress(capsys):
+    assert list(vanilla_progress(range(20))) == list(range(20))
+    out = capsys.readouterr().out.splitlines()
+    assert out == [f"{n}0% ..." for n in range(1, 10)] + ["100%"]
+
+    # unsized iterables are passed through without progress reports
+    assert list(vanilla_progress(iter(range(5)))) == list(range(5))
+    assert capsys.readouterr().out == ""
+
+    # quiet loops are not reported on
+    assert list(vanilla_progress(range(20), quiet=True)) == list(range(20))
+    assert capsys.readouterr().out == ""
+
+    # ranges with a step are reported against their actual length
+    assert list(vanilla_progress(range(0, 10, 3))) == [0, 3, 6, 9]
+    out = capsys.readouterr().out.splitlines()
+    assert out == ["20% ...", "50% ...", "70% ...", "100%"]